@@ -1,16 +1,126 @@
 # app/__init__.py - Enhanced Flask Application Factory
 
 import os
+import sys
+import json
 import time
 import logging
-from flask import Flask, request, jsonify, make_response, render_template, session
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import flask
+from flask import Flask, Response, g, request, jsonify, make_response, render_template, session
 from dotenv import load_dotenv
+from jinja2 import TemplateNotFound
 
 # Load environment variables first
 load_dotenv()
 
+# Package imports come after load_dotenv() since config reads the environment at import time
+from .config import get_config
+from .extensions import init_extensions, supabase_service
+from .auth import bp as auth_bp
+from .main import bp as main_bp
+
 logger = logging.getLogger(__name__)
 
+# Static security headers sent with every response
+SECURITY_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+    ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+)
+
+# Enhanced Content Security Policy (applied outside debug mode)
+CSP_HEADER = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://accounts.google.com https://apis.google.com; "
+    "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "img-src 'self' data: https: blob:; "
+    "connect-src 'self' https: wss:; "
+    "frame-src https://accounts.google.com https://www.youtube.com; "
+    "object-src 'none'; "
+    "base-uri 'self';"
+)
+
+# HSTS policy (applied when cookies are marked secure)
+HSTS_HEADER = 'max-age=31536000; includeSubDomains'
+
+# Seconds a /health result is reused before the services are checked again
+HEALTH_CACHE_TTL = 2.0
+
+# Static part of the /version payload
+_VERSION_PAYLOAD = {
+    "name": "DSA Mentor",
+    "version": "2.1.0",
+    "python_version": sys.version,
+    "flask_version": getattr(flask, '__version__', 'unknown')
+}
+
+# Pre-serialized JSON bodies for the static error responses
+_JSON_ERRORS = {
+    code: json.dumps(body).encode('utf-8')
+    for code, body in {
+        400: {
+            "error": "Bad request",
+            "message": "The request could not be understood by the server",
+            "code": 400
+        },
+        401: {
+            "error": "Unauthorized",
+            "message": "Authentication is required to access this resource",
+            "code": 401
+        },
+        403: {
+            "error": "Forbidden",
+            "message": "You don't have permission to access this resource",
+            "code": 403
+        },
+        404: {
+            "error": "Not found",
+            "message": "The requested resource was not found",
+            "code": 404
+        },
+        500: {
+            "error": "Internal server error",
+            "message": "An unexpected error occurred",
+            "code": 500
+        },
+        503: {
+            "error": "Service unavailable",
+            "message": "The service is temporarily unavailable",
+            "code": 503
+        },
+    }.items()
+}
+
+
+class SecurityMiddleware:
+    """WSGI middleware that appends the static security headers to every response"""
+
+    def __init__(self, app, hsts=False, csp=True):
+        self.app = app
+
+        headers = list(SECURITY_HEADERS)
+        if hsts:
+            headers.append(('Strict-Transport-Security', HSTS_HEADER))
+        if csp:
+            headers.append(('Content-Security-Policy', CSP_HEADER))
+
+        # WSGI servers encode header strings as latin-1; fail at startup, not per response
+        for name, value in headers:
+            name.encode('latin-1')
+            value.encode('latin-1')
+        self.static_headers = tuple(headers)
+
+    def __call__(self, environ, start_response):
+        def _start_response(status, headers, exc_info=None):
+            headers.extend(self.static_headers)
+            return start_response(status, headers, exc_info)
+
+        return self.app(environ, _start_response)
+
 def create_app(config_name="production"):
     """Create and configure the Flask application"""
     # Create Flask app
@@ -21,7 +131,6 @@ def create_app(config_name="production"):
 
     try:
         # Load configuration
-        from .config import get_config
         config_class = get_config(config_name)
         app.config.from_object(config_class)
 
@@ -30,9 +139,18 @@ def create_app(config_name="production"):
         app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
         app.config['SESSION_COOKIE_SECURE'] = os.environ.get("FLASK_ENV") == "production"
         app.config['SESSION_PROTECTION'] = None  # Disable for OAuth compatibility
+
+        # Normalize CORS origins once so request hooks only do a set lookup;
+        # ALLOWED_ORIGINS keeps the configured value, readers use the set
+        allowed_origins = app.config.get('ALLOWED_ORIGINS') or ''
+        if isinstance(allowed_origins, str):
+            allowed_origins = allowed_origins.split(',')
+        app.config['ALLOWED_ORIGINS_SET'] = frozenset(
+            _serialize_origin(o) for o in allowed_origins if o.strip()
+        )
+        app.config['DEBUG_CACHED'] = bool(app.config.get('DEBUG'))
         
         # Initialize extensions
-        from .extensions import init_extensions
         init_extensions(app)
 
         # Register blueprints
@@ -47,79 +165,113 @@ def create_app(config_name="production"):
         # Add utility routes
         add_utility_routes(app, config_name)
 
-        logger.info(f"🎯 Flask application created successfully with {config_name} config")
+        logger.info("🎯 Flask application created successfully with %s config", config_name)
 
     except Exception as e:
-        logger.error(f"❌ Failed to create Flask application: {e}")
+        logger.error("❌ Failed to create Flask application: %s", e)
         raise
 
     return app
 
+def _serialize_origin(origin):
+    """Serialize a configured origin the way browsers send it (RFC 6454)"""
+    # Lowercase scheme://host[:port] without a trailing slash, so an exact
+    # set lookup against the Origin header is all the CORS hooks need
+    return origin.strip().rstrip('/').lower()
+
 def register_blueprints(app):
     """Register application blueprints with error handling"""
     try:
-        # Import and register auth blueprint
-        from .auth import bp as auth_bp
+        # Register auth blueprint
         app.register_blueprint(auth_bp, url_prefix='/auth')
         logger.info("✅ Auth blueprint registered")
 
-        # Import and register main blueprint
-        from .main import bp as main_bp
+        # Register main blueprint
         app.register_blueprint(main_bp)
         logger.info("✅ Main blueprint registered")
 
         logger.info("✅ All blueprints registered successfully")
 
     except Exception as e:
-        logger.error(f"❌ Failed to register blueprints: {e}")
+        logger.error("❌ Failed to register blueprints: %s", e)
         raise
 
+def _wants_json():
+    """Whether an error response should be JSON instead of an HTML page"""
+    # Read the raw environ keys; the request properties parse and cache on first access
+    environ = request.environ
+    if environ.get('PATH_INFO', '')[:5] == '/api/':
+        return True
+    return environ.get('CONTENT_TYPE', '')[:16].lower() == 'application/json'
+
+_ERROR_PAGE_MESSAGES = {
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    500: "Internal Server Error",
+}
+
+def _prerender_error_pages(app):
+    """Render the optional HTML error pages once at startup"""
+    pages = {}
+    missing = set()
+    with app.app_context():
+        for code, message in _ERROR_PAGE_MESSAGES.items():
+            try:
+                pages[code] = render_template('error.html', error_code=code, error_message=message).encode('utf-8')
+            except TemplateNotFound as e:
+                missing.add(e.name)
+            except Exception as e:
+                logger.warning("⚠️ Could not pre-render error page %s: %s", code, e)
+        try:
+            pages[404] = render_template('404.html').encode('utf-8')
+        except TemplateNotFound as e:
+            missing.add(e.name)
+        except Exception as e:
+            logger.warning("⚠️ Could not pre-render 404 page: %s", e)
+    if missing:
+        logger.debug("No %s template(s); errors are served as JSON", ", ".join(sorted(missing)))
+    return pages
+
+def _json_error(code):
+    """Build a JSON error response from its pre-serialized body"""
+    return Response(_JSON_ERRORS[code], code, mimetype='application/json')
+
 def configure_error_handlers(app):
     """Configure enhanced error handlers"""
-    
+    error_pages = _prerender_error_pages(app)
+
+    def html_error(code):
+        page = error_pages.get(code)
+        if page is None:
+            return _json_error(code)
+        return Response(page, code, mimetype='text/html')
+
     @app.errorhandler(400)
     def bad_request(error):
-        if request.path.startswith('/api/') or request.is_json:
-            return jsonify({
-                "error": "Bad request",
-                "message": "The request could not be understood by the server",
-                "code": 400
-            }), 400
-        return render_template('error.html', error_code=400, error_message="Bad Request"), 400
+        if _wants_json():
+            return _json_error(400)
+        return html_error(400)
 
     @app.errorhandler(401)
     def unauthorized(error):
-        if request.path.startswith('/api/') or request.is_json:
-            return jsonify({
-                "error": "Unauthorized",
-                "message": "Authentication is required to access this resource",
-                "code": 401
-            }), 401
-        return render_template('error.html', error_code=401, error_message="Unauthorized"), 401
+        if _wants_json():
+            return _json_error(401)
+        return html_error(401)
 
     @app.errorhandler(403)
     def forbidden(error):
-        if request.path.startswith('/api/') or request.is_json:
-            return jsonify({
-                "error": "Forbidden",
-                "message": "You don't have permission to access this resource",
-                "code": 403
-            }), 403
-        return render_template('error.html', error_code=403, error_message="Forbidden"), 403
+        if _wants_json():
+            return _json_error(403)
+        return html_error(403)
 
     @app.errorhandler(404)
     def not_found(error):
-        if request.path.startswith('/api/') or request.is_json:
-            return jsonify({
-                "error": "Not found",
-                "message": "The requested resource was not found",
-                "code": 404
-            }), 404
-        
-        try:
-            return render_template('404.html'), 404
-        except:
-            return jsonify({"error": "Page not found"}), 404
+        if _wants_json():
+            return _json_error(404)
+        if 404 in error_pages:
+            return html_error(404)
+        return jsonify({"error": "Page not found"}), 404
 
     @app.errorhandler(429)
     def ratelimit_handler(error):
@@ -132,131 +284,125 @@ def configure_error_handlers(app):
 
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {error}")
-        if request.path.startswith('/api/') or request.is_json:
-            return jsonify({
-                "error": "Internal server error",
-                "message": "An unexpected error occurred",
-                "code": 500
-            }), 500
-        return render_template('error.html', error_code=500, error_message="Internal Server Error"), 500
+        logger.error("Internal server error: %s", error)
+        if _wants_json():
+            return _json_error(500)
+        return html_error(500)
 
     @app.errorhandler(503)
     def service_unavailable(error):
-        return jsonify({
-            "error": "Service unavailable",
-            "message": "The service is temporarily unavailable",
-            "code": 503
-        }), 503
+        return _json_error(503)
 
     logger.info("✅ Enhanced error handlers configured")
 
 def configure_middleware(app):
     """Configure enhanced application middleware"""
+    # Resolved once at startup; hooks below read these via closure
+    allowed_origins = app.config['ALLOWED_ORIGINS_SET']
+    debug = app.config['DEBUG_CACHED']
+    is_prod = not debug
+    secure_cookies = bool(app.config.get('SESSION_COOKIE_SECURE'))
     
-    @app.before_request
-    def log_request_info():
-        """Enhanced request logging"""
-        if app.config.get('DEBUG'):
-            logger.debug(f"📝 {request.method} {request.path}")
-            logger.debug(f"🍪 Cookies: {list(request.cookies.keys())}")
-            
-            if request.is_json and request.json:
-                logger.debug(f"📦 Request data: {request.json}")
-
-    @app.before_request
-    def ensure_session_config():
-        """Ensure session configuration is applied"""
-        if hasattr(session, 'permanent') and not session.permanent and 'google_id' in session:
-            session.permanent = True
-            session.modified = True
+    # Request logging is only registered in debug mode
+    if debug:
+        log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dsa-bg')
 
+        def _log_request(method, path, cookies, data):
+            logger.debug("📝 %s %s", method, path)
+            logger.debug("🍪 Cookies: %s", cookies)
+            
+            if data:
+                logger.debug("📦 Request data: %s", data)
+
+        @app.before_request
+        def log_request_info():
+            """Enhanced request logging, formatted off the request thread"""
+            # Only plain values are handed over; the request object is thread-local
+            data = request.get_json(silent=True) if request.is_json else None
+            log_executor.submit(_log_request, request.method, request.path,
+                                list(request.cookies.keys()), data)
+
+    def cors_origin():
+        """Allowed Origin for the current request (or None), decided once per request"""
+        if 'cors_origin' not in g:
+            origin = request.headers.get('Origin')
+            g.cors_origin = origin if origin and (debug or origin in allowed_origins) else None
+        return g.cors_origin
+
+    # Origin-independent preflight headers, built once
+    preflight_headers = (
+        ('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With'),
+        ('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS'),
+        ('Access-Control-Allow-Credentials', 'true'),
+        ('Access-Control-Max-Age', '86400'),
+    )
+
+    # Registered ahead of the session hook so preflights skip it entirely
     @app.before_request
     def handle_preflight():
         """Enhanced CORS preflight handling"""
         if request.method == "OPTIONS":
-            response = make_response()
-            origin = request.headers.get('Origin')
+            # 204 keeps the preflight body-less; caching headers are only
+            # emitted for allowed origins so rejections are not cached
+            response = make_response('', 204)
+            origin = cors_origin()
             
             if origin:
-                allowed_origins = app.config.get('ALLOWED_ORIGINS', [])
-                if isinstance(allowed_origins, str):
-                    allowed_origins = allowed_origins.split(',')
-                
-                allowed_origins = [o.strip() for o in allowed_origins if o.strip()]
-                
-                if app.config.get('DEBUG') or origin in allowed_origins:
-                    response.headers['Access-Control-Allow-Origin'] = origin
-                    response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization,X-Requested-With'
-                    response.headers['Access-Control-Allow-Methods'] = 'GET,PUT,POST,DELETE,OPTIONS'
-                    response.headers['Access-Control-Allow-Credentials'] = 'true'
-                    response.headers['Access-Control-Max-Age'] = '86400'
+                response.headers['Access-Control-Allow-Origin'] = origin
+                response.headers.extend(preflight_headers)
                     
             return response
 
-    @app.after_request
-    def add_security_headers(response):
-        """Enhanced security headers"""
-        # Basic security headers
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-
-        # Add HSTS in production
-        if app.config.get('SESSION_COOKIE_SECURE'):
-            response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-
-        # Enhanced Content Security Policy
-        if not app.config.get('DEBUG'):
-            csp = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://accounts.google.com https://apis.google.com; "
-                "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-                "font-src 'self' https://fonts.gstatic.com; "
-                "img-src 'self' data: https: blob:; "
-                "connect-src 'self' https: wss:; "
-                "frame-src https://accounts.google.com https://www.youtube.com; "
-                "object-src 'none'; "
-                "base-uri 'self';"
-            )
-            response.headers['Content-Security-Policy'] = csp
-
-        return response
+    @app.before_request
+    def ensure_session_config():
+        """Ensure session configuration is applied"""
+        # Setting permanent marks the session modified, so this only rewrites
+        # the cookie once per session
+        if not session.permanent and 'google_id' in session:
+            session.permanent = True
 
     @app.after_request  
     def add_cors_headers(response):
         """Enhanced CORS headers with session support"""
-        origin = request.headers.get('Origin')
-        
+        # Always vary on Origin so shared caches never mix CORS and non-CORS responses
+        response.vary.add('Origin')
+
+        # Reuses the preflight decision; also covers requests rejected by
+        # earlier before_request hooks (e.g. the rate limiter)
+        origin = cors_origin()
         if origin:
-            allowed_origins = app.config.get('ALLOWED_ORIGINS', [])
-            if isinstance(allowed_origins, str):
-                allowed_origins = allowed_origins.split(',')
-            
-            allowed_origins = [o.strip() for o in allowed_origins if o.strip()]
-            
-            if app.config.get('DEBUG') or origin in allowed_origins:
-                response.headers['Access-Control-Allow-Origin'] = origin
-                response.headers['Access-Control-Allow-Credentials'] = 'true'
-                response.headers['Vary'] = 'Origin'
+            response.headers.update({
+                'Access-Control-Allow-Origin': origin,
+                'Access-Control-Allow-Credentials': 'true'
+            })
 
         return response
 
+    # Static security headers are written once at the WSGI layer; HSTS only
+    # with secure cookies and CSP only outside debug mode
+    app.wsgi_app = SecurityMiddleware(app.wsgi_app, hsts=secure_cookies, csp=is_prod)
+
     logger.info("✅ Enhanced middleware configured")
 
 def add_utility_routes(app, config_name):
     """Add enhanced utility routes"""
+    # Last health result as [timestamp, (payload, status_code)], reused by
+    # probes arriving within HEALTH_CACHE_TTL seconds
+    health_cache = [0.0, None]
+    health_lock = threading.Lock()
     
     @app.route('/health')
     def health_check():
         """Enhanced application health check"""
-        try:
-            from .extensions import supabase_service
+        now = time.time()
+        cached = health_cache[1]
+        if cached and now - health_cache[0] < HEALTH_CACHE_TTL:
+            return jsonify(cached[0]), cached[1]
 
+        try:
             health_status = {
                 "status": "healthy",
-                "timestamp": time.time(),
+                "timestamp": now,
                 "config": config_name,
                 "version": "2.1.0",
                 "services": {
@@ -279,75 +425,35 @@ def add_utility_routes(app, config_name):
                 health_status["status"] = "degraded"
 
             status_code = 200 if health_status["status"] == "healthy" else 503
+            with health_lock:
+                health_cache[0] = now
+                health_cache[1] = (health_status, status_code)
             return jsonify(health_status), status_code
 
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             return jsonify({
                 "status": "unhealthy",
                 "timestamp": time.time(),
                 "error": str(e)
             }), 503
 
+    # Version info only changes between deployments, so serialize it once
+    version_payload = dict(
+        _VERSION_PAYLOAD,
+        config=config_name,
+        features={
+            "oauth_enabled": bool(app.config.get('GOOGLE_CLIENT_ID')),
+            "streaming_enabled": app.config.get('STREAMING_ENABLED', True),
+            "cors_enabled": bool(app.config.get('ALLOWED_ORIGINS_SET'))
+        }
+    )
+    version_bytes = json.dumps(version_payload).encode('utf-8')
+
     @app.route('/version')
     def version_info():
         """Enhanced version information"""
-        return jsonify({
-            "name": "DSA Mentor",
-            "version": "2.1.0",
-            "config": config_name,
-            "python_version": os.sys.version,
-            "flask_version": getattr(__import__('flask'), '__version__', 'unknown'),
-            "features": {
-                "oauth_enabled": bool(app.config.get('GOOGLE_CLIENT_ID')),
-                "streaming_enabled": app.config.get('STREAMING_ENABLED', True),
-                "cors_enabled": bool(app.config.get('ALLOWED_ORIGINS'))
-            }
-        })
-
-    @app.route('/')
-    def index():
-        """Enhanced main application page"""
-        try:
-            # Check if user is authenticated
-            is_authenticated = 'google_id' in session and session.get('email')
-            
-            # Prepare user data for frontend
-            user_data = {
-                "is_authenticated": is_authenticated,
-                "email": session.get('email'),
-                "name": session.get('name'),
-                "picture": session.get('picture'),
-                "user_id": session.get('google_id')
-            } if is_authenticated else {"is_authenticated": False}
-
-            # Check for login success parameter
-            login_success = request.args.get('login') == 'success'
-            login_error = request.args.get('error')
-
-            return render_template('index.html', 
-                                 user=user_data, 
-                                 login_success=login_success,
-                                 login_error=login_error,
-                                 config={
-                                     'streaming_enabled': app.config.get('STREAMING_ENABLED', True),
-                                     'max_query_length': app.config.get('MAX_QUERY_LENGTH', 2000)
-                                 })
-
-        except Exception as e:
-            logger.error(f"Failed to render index template: {e}")
-            return jsonify({
-                "message": "DSA Mentor API is running",
-                "version": "2.1.0",
-                "status": "healthy",
-                "endpoints": {
-                    "health": "/health",
-                    "version": "/version", 
-                    "auth": "/auth/login",
-                    "chat": "/chat",
-                    "auth_status": "/auth/auth-status"
-                }
-            })
+        return Response(version_bytes, mimetype='application/json')
 
     logger.info("✅ Enhanced utility routes added")
 
@@ -1,90 +1,296 @@
 # CRITICAL FIX: app/auth/routes.py - Fixed Session Management
 
+import os
 import time
+import base64
+import re
+import json
+import hmac
+import hashlib
 import secrets
 import logging
-from flask import request, session, redirect, jsonify, current_app, make_response, url_for
-from google_auth_oauthlib.flow import Flow
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_auth_requests
+import threading
+import functools
+import flask
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote, urlparse, urlsplit
+from flask import Response, current_app, request, session, redirect, jsonify, url_for, g
+from ..extensions import CacheService
 from . import bp
 
 logger = logging.getLogger("dsa-mentor")
 
-def _create_google_flow():
-    """Create Google OAuth flow with comprehensive error handling"""
+# Pre-serialized /auth-status bodies for each way a session can fail validation
+_UNAUTH_BODIES = {
+    message: json.dumps({"is_authenticated": False, "message": message}).encode('utf-8')
+    for message in ("No active session", "Invalid session data", "Session expired")
+}
+
+_FLASK_VERSION = getattr(flask, '__version__', 'unknown')
+
+# Authenticated /auth-status answers may be reused by the browser briefly;
+# logged-out answers never are, so a fresh login is seen immediately
+AUTH_STATUS_CACHE_CONTROL = 'private, max-age=30'
+_NO_STORE = {'Cache-Control': 'no-store'}
+
+def _auth_status_etag(google_id, login_time):
+    """Opaque tag identifying one login of one user"""
+    return hashlib.sha256(f"{google_id}:{login_time}".encode('utf-8')).hexdigest()[:32]
+
+# OAuth state: 16 random bytes (128 bits), 22 characters once base64url-encoded
+_STATE_BYTES = 16
+_STATE_LENGTH = 22
+
+# Per-login OAuth bookkeeping, dropped once the callback completes
+_OAUTH_TMP_KEYS = ('oauth_state', 'oauth_start_time')
+
+# Touch the OS RNG at import so the first login never waits on entropy
+secrets.token_bytes(32)
+
+# (connect, read) timeout for the authorization-code exchange with Google
+TOKEN_EXCHANGE_TIMEOUT = (3, 7)
+
+# Connection pool shared by every outbound Google call, so logins reuse
+# keep-alive TLS connections instead of opening new ones per callback
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+
+def _pooled_session():
+    """Create a requests session backed by the shared connection pool"""
+    http = requests.Session()
+    http.mount('https://', _HTTP_ADAPTER)
+    return http
+
+@functools.lru_cache(maxsize=1)
+def _google_libs():
+    """Import the Google auth libraries on first use rather than at worker boot"""
+    from google_auth_oauthlib.flow import Flow
+    from google.auth import jwt as google_jwt
+    from google.auth.transport import requests as google_auth_requests
+    return Flow, google_jwt, google_auth_requests
+
+@functools.lru_cache(maxsize=1)
+def _google_request():
+    """Shared transport for Google's signing certs, HTTP-cached when cachecontrol is installed"""
+    google_auth_requests = _google_libs()[2]
     try:
-        client_id = current_app.config.get("GOOGLE_CLIENT_ID")
-        client_secret = current_app.config.get("GOOGLE_CLIENT_SECRET")
-        
-        if not client_id or not client_secret:
-            logger.error("Google OAuth credentials not configured")
-            return None
-
-        # Create OAuth flow configuration
-        client_config = {
-            "web": {
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "auth_uri": "https://accounts.google.com/o/oauth2/v2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "redirect_uris": [current_app.config.get("REDIRECT_URI")]
-            }
-        }
+        from cachecontrol import CacheControl
+        return google_auth_requests.Request(session=CacheControl(_pooled_session()))
+    except ImportError:
+        logger.warning("cachecontrol not available - Google cert responses will not be HTTP-cached")
+        return google_auth_requests.Request(session=_pooled_session())
+
+# Google's ID-token signing certs ({kid: PEM}), verified against locally
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+_GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+_certs_cache = CacheService(max_size=1, ttl=3600)
+_certs_lock = threading.Lock()
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+def _google_certs(force_refresh=False):
+    """Return Google's signing certs, kept for the max-age Google advertises (default one hour)"""
+    if not force_refresh:
+        with _certs_lock:
+            certs = _certs_cache.get('certs')
+        if certs is not None:
+            return certs
+
+    # Fetch without holding the lock so a slow response never stalls other
+    # logins; concurrent misses may both fetch, and the last one wins
+    response = _google_request()(GOOGLE_CERTS_URL, method='GET', timeout=5)
+    if response.status != 200:
+        raise ValueError(f"Could not fetch Google certs: HTTP {response.status}")
+    certs = json.loads(response.data)
+    max_age = _MAX_AGE_RE.search(response.headers.get('cache-control', ''))
+    with _certs_lock:
+        _certs_cache.set('certs', certs, ttl=int(max_age.group(1)) if max_age else None)
+    return certs
+
+# Verified ID-token claims keyed by token hash, kept at most until the token expires
+_TOKEN_CACHE_TTL = 300
+_token_cache = CacheService(max_size=4096, ttl=_TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+def _verify_id_token(token, client_id):
+    """Verify a Google ID token, reusing the claims of recently verified tokens"""
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    with _token_cache_lock:
+        id_info = _token_cache.get(key)
+    if id_info is not None:
+        return id_info
+
+    google_jwt = _google_libs()[1]
+    certs = _google_certs()
+    if google_jwt.decode_header(token).get('kid') not in certs:
+        # Google rotated its keys since the last fetch
+        certs = _google_certs(force_refresh=True)
+    id_info = google_jwt.decode(token, certs=certs, audience=client_id)
+    if id_info.get('iss') not in _GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {id_info.get('iss')}")
+
+    ttl = min(id_info.get('exp', 0) - time.time(), _TOKEN_CACHE_TTL)
+    if ttl > 0:
+        with _token_cache_lock:
+            _token_cache.set(key, id_info, ttl=ttl)
+    return id_info
+
+_SCOPES = (
+    "https://www.googleapis.com/auth/userinfo.email",
+    "https://www.googleapis.com/auth/userinfo.profile",
+    "openid"
+)
+
+# Browsers drop these anywhere in a URL and treat backslashes as slashes
+_URL_IGNORED_CHARS = str.maketrans({'\t': None, '\n': None, '\r': None, '\\': '/'})
+_SAFE_RELATIVE_RE = re.compile(r'^/(?![/\\])')
+
+def _safe_next_url(next_url):
+    """Normalize a post-login redirect target, falling back to / unless it stays on a trusted host"""
+    # Redirect with the normalized value so the browser sees what was checked
+    next_url = str(next_url or '/').strip().translate(_URL_IGNORED_CHARS)
+    parsed = urlparse(next_url)
+    if not parsed.scheme and not parsed.netloc:
+        return next_url if _SAFE_RELATIVE_RE.match(next_url) else '/'
+    if parsed.scheme not in ('http', 'https') or parsed.path.startswith('//'):
+        return '/'
+    # 'https:evil.com' has a scheme but no authority; browsers resolve it off-site
+    if not parsed.netloc:
+        return '/'
+    if parsed.netloc != request.host and parsed.netloc not in _auth_cfg()['REDIRECT_NETLOCS']:
+        return '/'
+    return next_url
 
-        flow = Flow.from_client_config(
-            client_config,
-            scopes=[
-                "https://www.googleapis.com/auth/userinfo.email",
-                "https://www.googleapis.com/auth/userinfo.profile",
-                "openid"
-            ]
-        )
+def _create_google_flow():
+    """Create a Google OAuth flow from the client config built at registration"""
+    cfg = _auth_cfg()
+    client_config = cfg['CLIENT_CONFIG']
+    if client_config is None:
+        logger.error("Google OAuth credentials not configured")
+        return None
 
-        # Set redirect URI
-        redirect_uri = current_app.config.get("REDIRECT_URI")
-        if not redirect_uri:
-            redirect_uri = request.url_root.rstrip('/') + '/auth/oauth2callback'
-        
-        flow.redirect_uri = redirect_uri
-        logger.debug(f"OAuth flow configured with redirect URI: {redirect_uri}")
-        return flow
+    # Flow objects carry per-login state, so only the config is shared
+    Flow = _google_libs()[0]
+    flow = Flow.from_client_config(client_config, scopes=_SCOPES)
+
+    # Token exchange goes through the shared connection pool
+    flow.oauth2session.mount('https://', _HTTP_ADAPTER)
+
+    # Set redirect URI
+    redirect_uri = cfg['REDIRECT_URI']
+    if not redirect_uri:
+        redirect_uri = request.url_root.rstrip('/') + '/auth/oauth2callback'
+
+    flow.redirect_uri = redirect_uri
+    logger.debug("OAuth flow configured with redirect URI: %s", redirect_uri)
+    return flow
+
+# Config keys this blueprint reads, snapshotted per app when it is registered
+_AUTH_CONFIG_KEYS = (
+    'GOOGLE_CLIENT_ID', 'GOOGLE_CLIENT_SECRET', 'REDIRECT_URI', 'SECRET_KEY',
+    'ALLOWED_ORIGINS_SET', 'DEBUG_CACHED', 'FLASK_ENV', 'SESSION_PROTECTION',
+    'SESSION_COOKIE_NAME', 'SESSION_COOKIE_SECURE', 'SESSION_COOKIE_HTTPONLY',
+    'SESSION_COOKIE_SAMESITE'
+)
+
+def _auth_cfg():
+    """Auth config snapshot of the current app"""
+    return current_app.extensions['auth_config']
+
+def _snapshot_auth_config(state):
+    """Capture the auth config, session lifetime and OAuth client config once at registration"""
+    config = state.app.config
+    cfg = {key: config.get(key) for key in _AUTH_CONFIG_KEYS}
+
+    max_age = config.get('PERMANENT_SESSION_LIFETIME')
+    if hasattr(max_age, 'total_seconds'):
+        max_age = max_age.total_seconds()
+    else:
+        max_age = 43200  # 12 hours default
+    cfg['SESSION_MAX_AGE_SECONDS'] = max_age
+
+    # Hosts of the trusted frontends, which may also receive the post-login redirect
+    # (entries without a scheme have no netloc and are skipped)
+    cfg['REDIRECT_NETLOCS'] = frozenset(
+        urlsplit(origin).netloc for origin in cfg['ALLOWED_ORIGINS_SET'] or ()
+        if urlsplit(origin).netloc
+    )
+
+    # Static OAuth client config; only the Flow is built per request
+    client_id = cfg['GOOGLE_CLIENT_ID']
+    client_secret = cfg['GOOGLE_CLIENT_SECRET']
+    cfg['CLIENT_CONFIG'] = {
+        "web": {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "auth_uri": "https://accounts.google.com/o/oauth2/v2/auth",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "redirect_uris": [cfg['REDIRECT_URI']]
+        }
+    } if client_id and client_secret else None
 
-    except Exception as e:
-        logger.error(f"Failed to create Google OAuth flow: {e}")
-        return None
+    # Kept on the app so several apps in one process never share a snapshot
+    state.app.extensions['auth_config'] = cfg
 
-def _validate_session():
-    """Relaxed session validation for OAuth compatibility"""
-    try:
-        # Check for required session data
-        if 'google_id' not in session:
-            logger.debug("No google_id in session")
-            return False, "No active session"
-
-        if 'login_time' not in session:
-            logger.debug("No login_time in session")  
-            return False, "Invalid session data"
-
-        # Check session expiration
-        session_age = time.time() - session.get('login_time', 0)
-        max_age = current_app.config.get('PERMANENT_SESSION_LIFETIME')
-        
-        if hasattr(max_age, 'total_seconds'):
-            max_age = max_age.total_seconds()
-        else:
-            max_age = 43200  # 12 hours default
+# record_once returns None, so register explicitly to keep the name usable
+bp.record_once(_snapshot_auth_config)
 
-        if session_age > max_age:
-            logger.debug(f"Session expired: {session_age} > {max_age}")
-            return False, "Session expired"
+_certs_warmup_started = threading.Event()
 
-        logger.debug(f"Session valid for user: {session.get('email')}")
-        return True, "Valid session"
+def _start_certs_warmup():
+    """Prefetch Google's signing certs in the background, once per worker process"""
+    if _certs_warmup_started.is_set() or current_app.testing:
+        return
+    with _certs_lock:
+        if _certs_warmup_started.is_set():
+            return
+        _certs_warmup_started.set()
+    threading.Thread(target=_warm_google_certs, name='dsa-certs', daemon=True).start()
 
+def _warm_google_certs():
+    """Prefetch Google's signing certs, logging instead of raising on failure"""
+    try:
+        _google_certs()
+        logger.info("✅ Google signing certs prefetched")
     except Exception as e:
-        logger.error(f"Session validation error: {e}")
-        return False, "Session validation failed"
+        logger.warning("⚠️ Could not prefetch Google signing certs: %s", e)
+
+@bp.before_request
+def _stamp_request_time():
+    """Read the clock once per auth request"""
+    g.now = time.time()
+
+def _validate_session():
+    """Relaxed session validation for OAuth compatibility, returning (is_valid, message, session_age)"""
+    # Memoized per request so chained hooks and handlers validate only once
+    result = g.get('auth_validation')
+    if result is None:
+        result = g.auth_validation = _check_session()
+    return result
+
+def _check_session():
+    """Validate the current session against the configured lifetime"""
+    # Resolve the session proxy once; every lookup below hits the same object
+    current = session._get_current_object()
+
+    # Check for required session data
+    if 'google_id' not in current:
+        logger.debug("No google_id in session")
+        return False, "No active session", None
+
+    login_time = current.get('login_time')
+    if not isinstance(login_time, (int, float)):
+        logger.debug("No valid login_time in session")
+        return False, "Invalid session data", None
+
+    # Check session expiration
+    session_age = g.now - login_time
+    max_age = _auth_cfg()['SESSION_MAX_AGE_SECONDS']
+    if session_age > max_age:
+        logger.debug("Session expired: %s > %s", session_age, max_age)
+        return False, "Session expired", session_age
+
+    logger.debug("Session valid for user: %s", current.get('email'))
+    return True, "Valid session", session_age
 
 @bp.route('/login')
 def login():
@@ -97,17 +303,18 @@ def login():
                 "message": "Google OAuth is not properly configured"
             }), 503
 
-        # Store the 'next' URL for post-login redirect
-        next_url = request.args.get('next', '/')
-        session['next_url'] = next_url
+        # The callback needs the certs; fetch them while the user is at Google
+        _start_certs_warmup()
 
-        # Clear any existing session data
+        # Reset the session, then store the post-login 'next' URL and the
+        # OAuth state for CSRF protection in one update
+        state = base64.urlsafe_b64encode(os.urandom(_STATE_BYTES)).rstrip(b'=').decode('ascii')
         session.clear()
-
-        # Generate and store OAuth state for CSRF protection
-        state = secrets.token_urlsafe(32)
-        session['oauth_state'] = state
-        session['oauth_start_time'] = time.time()
+        session.update({
+            'next_url': request.args.get('next', '/'),
+            'oauth_state': state,
+            'oauth_start_time': g.now
+        })
 
         # Generate authorization URL
         auth_url, _ = flow.authorization_url(
@@ -117,11 +324,11 @@ def login():
             prompt='select_account'  # Always show account selection
         )
 
-        logger.info(f"🔐 Initiating OAuth flow")
+        logger.info("🔐 Initiating OAuth flow")
         return redirect(auth_url)
 
     except Exception as e:
-        logger.error(f"Login initiation error: {e}")
+        logger.error("Login initiation error: %s", e)
         return jsonify({
             "error": "Authentication failed",
             "message": "Unable to start authentication process"
@@ -131,27 +338,28 @@ def login():
 def oauth2callback():
     """✅ CRITICAL FIX: Handle OAuth2 callback with PROPER session creation"""
     try:
+        # Handle OAuth errors (e.g. access_denied) before any other work
+        error = request.args.get('error')
+        if error:
+            logger.warning("OAuth error: %s", error)
+            return redirect(url_for('main.index') + '?error=' + quote(error))
+
         # Validate OAuth state parameter
         state = request.args.get('state')
         session_state = session.get('oauth_state')
         
-        if not state or not session_state or state != session_state:
+        # Compare as bytes: compare_digest rejects non-ASCII str input
+        if not state or len(state) != _STATE_LENGTH or not session_state or not hmac.compare_digest(
+                state.encode('utf-8'), session_state.encode('utf-8')):
             logger.warning("OAuth state mismatch - possible CSRF attack")
             return redirect(url_for('main.index') + '?error=invalid_state')
 
         # Check OAuth flow timeout (15 minutes max)
         oauth_start_time = session.get('oauth_start_time', 0)
-        if time.time() - oauth_start_time > 900:  # 15 minutes
+        if g.now - oauth_start_time > 900:  # 15 minutes
             logger.warning("OAuth flow expired")
             return redirect(url_for('main.index') + '?error=timeout')
 
-        # Handle OAuth errors
-        error = request.args.get('error')
-        if error:
-            logger.warning(f"OAuth error: {error}")
-            error_description = request.args.get('error_description', 'Unknown error')
-            return redirect(url_for('main.index') + f'?error={error}')
-
         # Create OAuth flow
         flow = _create_google_flow()
         if not flow:
@@ -163,23 +371,23 @@ def oauth2callback():
             return redirect(url_for('main.index') + '?error=no_code')
 
         try:
-            flow.fetch_token(authorization_response=request.url)
+            flow.fetch_token(authorization_response=request.url, timeout=TOKEN_EXCHANGE_TIMEOUT)
+        except requests.exceptions.Timeout as e:
+            logger.error("Token exchange timed out: %s", e)
+            return redirect(url_for('main.index') + '?error=token_exchange_timeout')
         except Exception as e:
-            logger.error(f"Token exchange failed: {e}")
+            logger.error("Token exchange failed: %s", e)
             return redirect(url_for('main.index') + '?error=token_exchange_failed')
 
         # Get user info from Google
         credentials = flow.credentials
-        request_session = google_auth_requests.Request()
-        
         try:
-            id_info = id_token.verify_oauth2_token(
+            id_info = _verify_id_token(
                 credentials.id_token,
-                request_session,
-                current_app.config.get("GOOGLE_CLIENT_ID")
+                _auth_cfg()["GOOGLE_CLIENT_ID"]
             )
         except Exception as e:
-            logger.error(f"Token verification failed: {e}")
+            logger.error("Token verification failed: %s", e)
             return redirect(url_for('main.index') + '?error=token_verification_failed')
 
         # Extract user information
@@ -192,104 +400,100 @@ def oauth2callback():
             logger.error("Incomplete user information from Google")
             return redirect(url_for('main.index') + '?error=incomplete_user_info')
 
-        # ✅ CRITICAL FIX: Create persistent session
-        session.permanent = True  # Mark session as permanent
-        session.modified = True   # Force session save
-        
-        # Store user information
-        session['google_id'] = user_id
-        session['email'] = email
-        session['name'] = name
-        session['picture'] = picture
-        session['login_time'] = time.time()
+        # ✅ CRITICAL FIX: Create persistent session and store user information
+        # in one update (which also marks the session modified)
+        session.permanent = True
+        session.update({
+            'google_id': user_id,
+            'email': email,
+            'name': name,
+            'picture': picture,
+            'login_time': g.now
+        })
 
         # Clear OAuth temporary data
-        session.pop('oauth_state', None)
-        session.pop('oauth_start_time', None)
+        for key in _OAUTH_TMP_KEYS:
+            session.pop(key, None)
 
-        logger.info(f"✅ Session created for user: {email}")
-        logger.info(f"✅ Session ID: {session.get('google_id')}")
+        logger.info("✅ Session created for user: %s", email)
+        logger.debug("Session ID: %s", user_id)
 
         # Redirect to original destination or home
         next_url = session.pop('next_url', '/')
         
         # Validate redirect URL to prevent open redirects
-        if next_url.startswith('http') and not next_url.startswith(request.host_url):
-            next_url = '/'
+        next_url = _safe_next_url(next_url)
 
-        logger.info(f"✅ Redirecting authenticated user to: {next_url}")
+        logger.info("✅ Redirecting authenticated user to: %s", next_url)
         
-        # Create response with success parameter
-        response = make_response(redirect(next_url + ('&' if '?' in next_url else '?') + 'login=success'))
-        return response
+        # Redirect straight to the destination with the success parameter
+        return redirect(next_url + ('&' if '?' in next_url else '?') + 'login=success')
 
     except Exception as e:
-        logger.error(f"OAuth callback error: {e}")
+        logger.error("OAuth callback error: %s", e)
         return redirect(url_for('main.index') + '?error=callback_failed')
 
 @bp.route('/logout', methods=['POST'])
 def logout():
     """Logout user and clear session"""
-    try:
-        user_email = session.get('email', 'Unknown')
-        
-        # Clear session data
-        session.clear()
-        
-        logger.info(f"🔐 User logged out: {user_email}")
-        
-        return jsonify({
-            "message": "Logged out successfully",
-            "redirect": "/"
-        })
+    user_email = session.get('email', 'Unknown')
 
-    except Exception as e:
-        logger.error(f"Logout error: {e}")
-        return jsonify({
-            "error": "Logout failed",
-            "message": "An error occurred during logout"
-        }), 500
+    # Clear session data
+    session.clear()
+
+    logger.info("🔐 User logged out: %s", user_email)
+
+    return jsonify({
+        "message": "Logged out successfully",
+        "redirect": "/"
+    })
 
 @bp.route('/auth-status')
 def auth_status():
     """✅ IMPROVED: Get current authentication status"""
-    try:
-        logger.debug(f"Auth status check - session keys: {list(session.keys())}")
-        
-        is_valid, message = _validate_session()
-
-        if is_valid:
-            user_data = {
-                "is_authenticated": True,
-                "user_id": session.get('google_id'),
-                "email": session.get('email'),
-                "name": session.get('name'),
-                "picture": session.get('picture'),
-                "login_time": session.get('login_time'),
-                "session_age": time.time() - session.get('login_time', 0)
-            }
+    # Without a session cookie there is nothing to decode or validate
+    if _auth_cfg()['SESSION_COOKIE_NAME'] not in request.cookies:
+        return Response(_UNAUTH_BODIES["No active session"], 401, mimetype='application/json',
+                        headers=_NO_STORE)
+
+    logger.debug("Auth status check - session keys: %s", session.keys())
+
+    is_valid, message, session_age = _validate_session()
+    if not is_valid:
+        logger.debug("❌ Auth status: %s", message)
+        return Response(_UNAUTH_BODIES[message], 401, mimetype='application/json',
+                        headers=_NO_STORE)
+
+    # The answer only changes on login/logout, so revalidation keys on the
+    # session identity and is answered without a body
+    etag = _auth_status_etag(session.get('google_id'), session.get('login_time'))
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        user_data = {
+            "is_authenticated": True,
+            "user_id": session.get('google_id'),
+            "email": session.get('email'),
+            "name": session.get('name'),
+            "picture": session.get('picture'),
+            "login_time": session.get('login_time'),
+            "session_age": session_age
+        }
 
-            logger.debug(f"✅ Auth status: User authenticated as {user_data['email']}")
-            return jsonify(user_data)
-        else:
-            logger.debug(f"❌ Auth status: {message}")
-            return jsonify({
-                "is_authenticated": False,
-                "message": message
-            }), 401
+        logger.debug("✅ Auth status: User authenticated as %s", user_data['email'])
+        response = jsonify(user_data)
 
-    except Exception as e:
-        logger.error(f"Auth status check error: {e}")
-        return jsonify({
-            "is_authenticated": False,
-            "error": "Unable to verify authentication status"
-        }), 500
+    # Let the browser reuse the answer briefly instead of polling the server
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = AUTH_STATUS_CACHE_CONTROL
+    response.vary.add('Cookie')
+    return response
 
 @bp.route('/user-info')
 def user_info():
     """Get detailed user information (requires authentication)"""
     try:
-        is_valid, message = _validate_session()
+        is_valid, message, session_age = _validate_session()
         
         if not is_valid:
             return jsonify({
@@ -303,11 +507,11 @@ def user_info():
             "name": session.get('name'),
             "picture": session.get('picture'),
             "login_time": session.get('login_time'),
-            "session_age": time.time() - session.get('login_time', 0)
+            "session_age": session_age
         })
 
     except Exception as e:
-        logger.error(f"User info error: {e}")
+        logger.error("User info error: %s", e)
         return jsonify({
             "error": "Unable to retrieve user information"
         }), 500
@@ -315,6 +519,11 @@ def user_info():
 @bp.route('/session-debug')
 def session_debug():
     """Enhanced debug route to check session state"""
+    # Session internals are only exposed outside production
+    cfg = _auth_cfg()
+    if not cfg['DEBUG_CACHED']:
+        return jsonify({"error": "disabled"}), 404
+
     try:
         session_data = {
             "has_session": bool(session),
@@ -323,7 +532,7 @@ def session_debug():
             "email": session.get('email', 'None'),
             "name": session.get('name', 'None'),
             "login_time": session.get('login_time', 'None'),
-            "session_age": time.time() - session.get('login_time', 0) if 'login_time' in session else 'N/A',
+            "session_age": g.now - session.get('login_time', 0) if 'login_time' in session else 'N/A',
             "session_permanent": session.permanent,
             "session_new": session.new,
             "session_modified": session.modified
@@ -332,32 +541,33 @@ def session_debug():
         validation_result = _validate_session()
         
         config_info = {
-            "cookie_name": current_app.config.get('SESSION_COOKIE_NAME'),
-            "cookie_secure": current_app.config.get('SESSION_COOKIE_SECURE'),
-            "cookie_httponly": current_app.config.get('SESSION_COOKIE_HTTPONLY'),
-            "cookie_samesite": current_app.config.get('SESSION_COOKIE_SAMESITE'),
-            "session_lifetime_hours": current_app.config.get('PERMANENT_SESSION_LIFETIME').total_seconds() / 3600,
-            "session_protection": current_app.config.get('SESSION_PROTECTION'),
-            "flask_env": current_app.config.get('FLASK_ENV')
+            "cookie_name": cfg['SESSION_COOKIE_NAME'],
+            "cookie_secure": cfg['SESSION_COOKIE_SECURE'],
+            "cookie_httponly": cfg['SESSION_COOKIE_HTTPONLY'],
+            "cookie_samesite": cfg['SESSION_COOKIE_SAMESITE'],
+            "session_lifetime_hours": cfg['SESSION_MAX_AGE_SECONDS'] / 3600,
+            "session_protection": cfg['SESSION_PROTECTION'],
+            "flask_env": cfg['FLASK_ENV']
         }
 
         cookie_info = {
-            "has_session_cookie": current_app.config.get('SESSION_COOKIE_NAME') in request.cookies,
-            "all_cookies": list(request.cookies.keys()),
-            "user_agent": request.headers.get('User-Agent', 'None')[:100]
+            "has_session_cookie": cfg['SESSION_COOKIE_NAME'] in request.cookies
         }
+        if request.args.get('verbose') == '1':
+            cookie_info["all_cookies"] = list(request.cookies.keys())
+            cookie_info["user_agent"] = request.headers.get('User-Agent', 'None')[:100]
 
         return jsonify({
-            "timestamp": time.time(),
+            "timestamp": g.now,
             "session_data": session_data,
-            "validation_result": validation_result,
+            "validation_result": validation_result[:2],
             "config_info": config_info,
             "cookie_info": cookie_info,
-            "flask_version": getattr(__import__('flask'), '__version__', 'unknown')
+            "flask_version": _FLASK_VERSION
         })
 
     except Exception as e:
-        logger.error(f"Session debug error: {e}")
+        logger.error("Session debug error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # ✅ NEW: Session recovery endpoint
@@ -369,11 +579,11 @@ def session_recovery():
         recovery_data = request.get_json() or {}
         
         # Log recovery attempt
-        logger.info(f"🔧 Session recovery attempt from: {request.remote_addr}")
-        logger.info(f"Recovery data: {recovery_data.keys()}")
+        logger.info("🔧 Session recovery attempt from: %s", request.remote_addr)
+        logger.info("Recovery data: %s", recovery_data.keys())
         
         # Check if session exists and is valid
-        is_valid, message = _validate_session()
+        is_valid, message, session_age = _validate_session()
         
         if is_valid:
             return jsonify({
@@ -394,7 +604,7 @@ def session_recovery():
             }), 401
 
     except Exception as e:
-        logger.error(f"Session recovery error: {e}")
+        logger.error("Session recovery error: %s", e)
         return jsonify({
             "success": False,
             "error": str(e)
@@ -404,20 +614,21 @@ def session_recovery():
 @bp.route('/health')
 def auth_health():
     """Authentication system health check"""
+    cfg = _auth_cfg()
     try:
         health_status = {
             "status": "healthy",
-            "timestamp": time.time(),
+            "timestamp": g.now,
             "services": {
-                "google_oauth": bool(current_app.config.get("GOOGLE_CLIENT_ID") and 
-                                   current_app.config.get("GOOGLE_CLIENT_SECRET")),
-                "session_config": bool(current_app.config.get("SECRET_KEY")),
-                "cors_config": bool(current_app.config.get("ALLOWED_ORIGINS"))
+                "google_oauth": bool(cfg["GOOGLE_CLIENT_ID"] and 
+                                   cfg["GOOGLE_CLIENT_SECRET"]),
+                "session_config": bool(cfg["SECRET_KEY"]),
+                "cors_config": bool(cfg["ALLOWED_ORIGINS_SET"])
             },
             "config": {
-                "session_cookie_samesite": current_app.config.get("SESSION_COOKIE_SAMESITE"),
-                "session_cookie_secure": current_app.config.get("SESSION_COOKIE_SECURE"),
-                "redirect_uri": current_app.config.get("REDIRECT_URI")
+                "session_cookie_samesite": cfg["SESSION_COOKIE_SAMESITE"],
+                "session_cookie_secure": cfg["SESSION_COOKIE_SECURE"],
+                "redirect_uri": cfg["REDIRECT_URI"]
             }
         }
 
@@ -429,11 +640,11 @@ def auth_health():
         return jsonify(health_status), status_code
 
     except Exception as e:
-        logger.error(f"Auth health check failed: {e}")
+        logger.error("Auth health check failed: %s", e)
         return jsonify({
             "status": "unhealthy",
             "error": str(e),
-            "timestamp": time.time()
+            "timestamp": g.now
         }), 503
 
 # Rate limiting (optional)
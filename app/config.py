@@ -2,6 +2,7 @@
 
 import os
 from datetime import timedelta
+from functools import lru_cache
 
 class BaseConfig:
     # Core Flask settings
@@ -18,6 +19,15 @@ class BaseConfig:
     SESSION_COOKIE_DOMAIN = None           # NEW: Auto-detect domain
     PERMANENT_SESSION_LIFETIME = timedelta(hours=8)  # EXTENDED: 8 hours instead of 2
 
+    # Server-side sessions: when REDIS_URL is set, sessions live in Redis and
+    # the cookie only carries a signed session ID
+    REDIS_URL = os.environ.get("REDIS_URL")
+    SESSION_USE_SIGNER = True
+
+    # Expiry is enforced from login_time, so unchanged sessions need not be
+    # re-signed and re-sent (or re-written to Redis) on every response
+    SESSION_REFRESH_EACH_REQUEST = False
+
     # CORS configuration - essential for frontend
     ALLOWED_ORIGINS = os.environ.get(
         "ALLOWED_ORIGINS",
@@ -153,6 +163,10 @@ class ProductionConfig(BaseConfig):
     # ✅ CRITICAL: Longer session for production (8 hours instead of 2)
     PERMANENT_SESSION_LIFETIME = timedelta(hours=8)
 
+    # Let browsers cache static assets; filenames are not fingerprinted,
+    # so keep this short enough for deploys to show up within the hour
+    SEND_FILE_MAX_AGE_DEFAULT = timedelta(hours=1)
+
     # Production CORS (restrictive)
     ALLOWED_ORIGINS = os.environ.get(
         "ALLOWED_ORIGINS",
@@ -182,6 +196,11 @@ def get_config(name: str = None):
     if name is None:
         name = os.environ.get("FLASK_ENV", "development")
 
+    return _load_config(name)
+
+@lru_cache(maxsize=4)
+def _load_config(name: str):
+    """Resolve and validate a configuration class once per name"""
     config_classes = {
         "development": DevelopmentConfig,
         "production": ProductionConfig,
@@ -1,12 +1,19 @@
 # extensions.py - Database and External Services Configuration
 import logging
 import os
+import threading
 from typing import Optional
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
@@ -24,12 +31,16 @@ class SupabaseService:
         if cls._instance is None:
             cls._instance = super(SupabaseService, cls).__new__(cls)
             cls._instance._initialized = False
+            cls._instance._init_lock = threading.Lock()
         return cls._instance
     
-    def __init__(self):
+    def _ensure_initialized(self):
+        """Create the client on first use rather than at import"""
         if not self._initialized:
-            self._initialize()
-            self._initialized = True
+            with self._init_lock:
+                if not self._initialized:
+                    self._initialize()
+                    self._initialized = True
     
     def _initialize(self):
         """Initialize Supabase client"""
@@ -43,20 +54,21 @@ class SupabaseService:
         
         try:
             self._client = create_client(url, key)
-            logger.info(f"✅ Supabase client initialized successfully")
-            logger.info(f"🔗 Connected to: {url[:30]}...")
+            logger.info("✅ Supabase client initialized successfully")
+            logger.info("🔗 Connected to: %s...", url[:30])
         except Exception as e:
-            logger.error(f"❌ Failed to create Supabase client: {e}")
+            logger.error("❌ Failed to create Supabase client: %s", e)
             self._client = None
     
     @property
     def client(self) -> Optional[Client]:
         """Get the Supabase client instance"""
+        self._ensure_initialized()
         return self._client
     
     def is_connected(self) -> bool:
         """Check if Supabase client is connected"""
-        return self._client is not None
+        return self.client is not None
     
     def get_table(self, table_name: str):
         """Get a table reference"""
@@ -75,7 +87,7 @@ class SupabaseService:
             return True
             
         except Exception as e:
-            logger.error(f"Database health check failed: {e}")
+            logger.error("Database health check failed: %s", e)
             return False
 
 
@@ -92,15 +104,15 @@ class CacheService:
         import time
         
         if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl:
+            data, timestamp, expires_at = self.cache[key]
+            if time.time() < expires_at:
                 return data
             else:
                 del self.cache[key]
         return None
     
-    def set(self, key: str, value):
-        """Set item in cache"""
+    def set(self, key: str, value, ttl: float = None):
+        """Set item in cache, optionally with a shorter per-entry TTL"""
         import time
         import hashlib
         
@@ -111,7 +123,8 @@ class CacheService:
                            key=lambda k: self.cache[k][1])
             del self.cache[oldest_key]
         
-        self.cache[key] = (value, time.time())
+        now = time.time()
+        self.cache[key] = (value, now, now + (self.ttl if ttl is None else ttl))
     
     def clear(self):
         """Clear all cache entries"""
@@ -122,6 +135,32 @@ class CacheService:
         return len(self.cache)
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def _dumps_bytes(self, obj, sort_keys=None, indent=None, default=None, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default or self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response from orjson's bytes without a str round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype
+        )
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Global service instances
 supabase_service = SupabaseService()
 cache_service = CacheService()
@@ -153,14 +192,39 @@ def init_extensions(app):
         os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
         logger.info("🔓 OAuth insecure transport enabled for development")
     
+    # Faster JSON serialization (optional)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+        logger.info("✅ orjson JSON provider enabled")
+    
     # Initialize CORS
     cors.init_app(app, 
-                  origins=app.config.get('ALLOWED_ORIGINS', '').split(','),
+                  origins=sorted(app.config.get('ALLOWED_ORIGINS_SET', ())),
                   supports_credentials=True,
                   allow_headers=['Content-Type', 'Authorization'],
                   methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
     logger.info("✅ CORS initialized")
     
+    # Server-side sessions (optional)
+    if app.config.get('REDIS_URL'):
+        try:
+            import redis
+            from flask_session import Session
+
+            app.config.setdefault('SESSION_TYPE', 'redis')
+            app.config.setdefault('SESSION_KEY_PREFIX', 'dsa:session:')
+            # Bounded timeouts so a Redis stall fails the request instead of hanging it
+            app.config.setdefault('SESSION_REDIS', redis.from_url(
+                app.config['REDIS_URL'],
+                socket_timeout=2,
+                socket_connect_timeout=2,
+                health_check_interval=30
+            ))
+            Session(app)
+            logger.info("✅ Sessions stored in Redis")
+        except ImportError:
+            logger.warning("⚠️ Flask-Session not available - using signed cookie sessions")
+    
     # Initialize rate limiter
     try:
         # Use Redis if available, otherwise fall back to in-memory
@@ -174,24 +238,10 @@ def init_extensions(app):
         limiter.init_app(app)
         
     except Exception as e:
-        logger.warning(f"⚠️ Rate limiter initialization failed: {e}")
-    
-    # Verify services
-    logger.info(f"🔗 Supabase service connected: {supabase_service.is_connected()}")
-    
-    if not supabase_service.is_connected():
-        logger.error("❌ CRITICAL: Supabase client is not connected!")
-        
-    # Perform health checks
-    try:
-        if supabase_service.health_check():
-            logger.info("✅ Database health check passed")
-        else:
-            logger.warning("⚠️ Database health check failed")
-    except Exception as e:
-        logger.error(f"❌ Database health check error: {e}")
+        logger.warning("⚠️ Rate limiter initialization failed: %s", e)
     
-    logger.info(f"📊 Cache service initialized (max size: {cache_service.max_size})")
+    # Supabase connects on first use; /health reports its status
+    logger.info("📊 Cache service initialized (max size: %s)", cache_service.max_size)
     logger.info("🎯 All extensions initialized successfully")
 
 
@@ -205,5 +255,8 @@ def get_cache() -> CacheService:
     return cache_service
 
 
-# Export for backward compatibility
-supabase = supabase_service.client
+def __getattr__(name):
+    """Resolve the backward-compatible ``supabase`` export on first access"""
+    if name == 'supabase':
+        return supabase_service.client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
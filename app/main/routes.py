@@ -6,8 +6,8 @@ import re
 import logging
 from datetime import datetime
 from flask import (
-    render_template, jsonify, request, session, make_response,
-    redirect, url_for, Response, stream_with_context, current_app
+    render_template, jsonify, request, session,
+    redirect, url_for, Response, stream_with_context, current_app, g
 )
 
 from . import bp
@@ -23,6 +23,27 @@ from ..services.pdf import generate_pdf_from_html
 
 logger = logging.getLogger("dsa-mentor")
 
+def _main_cfg():
+    """Main blueprint config snapshot of the current app"""
+    return current_app.extensions['main_config']
+
+
+@bp.record_once
+def _snapshot_main_config(state):
+    """Capture the query limit and session lifetime once per app at registration"""
+    config = state.app.config
+
+    max_age = config.get('PERMANENT_SESSION_LIFETIME')
+    if hasattr(max_age, 'total_seconds'):
+        max_age = max_age.total_seconds()
+    else:
+        max_age = 7200  # 2 hours default
+
+    state.app.extensions['main_config'] = {
+        'MAX_QUERY_LENGTH': config.get('MAX_QUERY_LENGTH', 2000),
+        'SESSION_MAX_AGE_SECONDS': max_age
+    }
+
 
 def validate_and_sanitize_query(data):
     """Comprehensive input validation and sanitization"""
@@ -34,7 +55,7 @@ def validate_and_sanitize_query(data):
         return False, "Query cannot be empty"
     
     # Length validation
-    max_length = current_app.config.get('MAX_QUERY_LENGTH', 2000)
+    max_length = _main_cfg()['MAX_QUERY_LENGTH']
     if len(query) > max_length:
         return False, f"Query too long (max {max_length} characters)"
     
@@ -51,7 +72,7 @@ def validate_and_sanitize_query(data):
     
     for pattern in dangerous_patterns:
         if re.search(pattern, query, re.IGNORECASE):
-            logger.warning(f"Suspicious input detected: {pattern}")
+            logger.warning("Suspicious input detected: %s", pattern)
             return False, "Invalid input detected"
     
     # SQL injection prevention
@@ -63,7 +84,7 @@ def validate_and_sanitize_query(data):
     
     for pattern in sql_patterns:
         if re.search(pattern, query, re.IGNORECASE):
-            logger.warning(f"Potential SQL injection attempt: {query[:100]}...")
+            logger.warning("Potential SQL injection attempt: %s...", query[:100])
             return False, "Invalid input format"
     
     # Sanitize the query
@@ -79,7 +100,9 @@ def require_authentication(f):
     
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'google_id' not in session:
+        # Single session probe; handlers read the user id from g
+        g.user_id = session.get('google_id')
+        if g.user_id is None:
             return jsonify({
                 "error": "Authentication required",
                 "message": "Please sign in to access this feature"
@@ -87,14 +110,7 @@ def require_authentication(f):
         
         # Check session validity
         login_time = session.get('login_time', 0)
-        max_age = current_app.config.get('PERMANENT_SESSION_LIFETIME')
-        
-        if hasattr(max_age, 'total_seconds'):
-            max_age = max_age.total_seconds()
-        else:
-            max_age = 7200  # 2 hours default
-        
-        if time.time() - login_time > max_age:
+        if time.time() - login_time > _main_cfg()['SESSION_MAX_AGE_SECONDS']:
             session.clear()
             return jsonify({
                 "error": "Session expired",
@@ -112,7 +128,7 @@ def index():
     try:
         return render_template('index.html')
     except Exception as e:
-        logger.error(f"Failed to render index template: {e}")
+        logger.error("Failed to render index template: %s", e)
         return jsonify({
             "message": "DSA Mentor is running",
             "version": "2.0.0",
@@ -128,7 +144,7 @@ def chat():
     start_time = time.time()
     request_id = str(uuid.uuid4())[:8]
     
-    logger.info(f"🔍 Chat request {request_id} started")
+    logger.info("🔍 Chat request %s started", request_id)
     
     try:
         # Validate request content type
@@ -141,26 +157,26 @@ def chat():
         # Validate and sanitize input
         is_valid, result = validate_and_sanitize_query(request.json)
         if not is_valid:
-            logger.warning(f"Invalid query in request {request_id}: {result}")
+            logger.warning("Invalid query in request %s: %s", request_id, result)
             return jsonify({
                 "error": "Invalid input",
                 "message": result
             }), 400
         
         user_query = result
-        user_id = session.get('google_id')
+        user_id = g.user_id
         user_email = session.get('email', 'unknown')
         
-        logger.info(f"📝 Processing query for {user_email}: {user_query[:50]}...")
+        logger.info("📝 Processing query for %s: %s...", user_email, user_query[:50])
         
         # Step 1: Classify user intent
         classification = classify_query_with_groq(user_query)
-        logger.debug(f"Intent classification: {classification}")
+        logger.debug("Intent classification: %s", classification)
         
         # Step 2: Check for special intent responses
         special_response = generate_response_by_intent(classification, user_query)
         if special_response:
-            logger.info(f"✨ Special response generated for {classification.get('type')}")
+            logger.info("✨ Special response generated for %s", classification.get('type'))
             processing_time = time.time() - start_time
             
             return jsonify({
@@ -184,7 +200,7 @@ def chat():
                 }), 503
                 
         except Exception as e:
-            logger.error(f"Database fetch error: {e}")
+            logger.error("Database fetch error: %s", e)
             return jsonify({
                 "error": "Database error",
                 "message": "Unable to access knowledge base"
@@ -198,7 +214,7 @@ def chat():
         try:
             videos = get_videos(user_query, limit=3)
         except Exception as e:
-            logger.warning(f"Video fetch failed: {e}")
+            logger.warning("Video fetch failed: %s", e)
             videos = []
         
         # Step 6: Generate response
@@ -261,13 +277,13 @@ def chat():
         processing_time = time.time() - start_time
         response_data["processing_time"] = round(processing_time, 2)
         
-        logger.info(f"✅ Chat request {request_id} completed in {processing_time:.2f}s")
+        logger.info("✅ Chat request %s completed in %.2fs", request_id, processing_time)
         
         return jsonify(response_data)
         
     except Exception as e:
         processing_time = time.time() - start_time
-        logger.error(f"❌ Chat request {request_id} failed after {processing_time:.2f}s: {e}")
+        logger.error("❌ Chat request %s failed after %.2fs: %s", request_id, processing_time, e)
         
         return jsonify({
             "error": "Processing failed",
@@ -295,16 +311,16 @@ def download_chat():
         if not pdf_bytes:
             return jsonify({"error": "PDF generation failed"}), 500
         
-        # Create response with PDF
-        response = make_response(pdf_bytes)
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename="dsa_chat_{int(time.time())}.pdf"'
-        response.headers['Content-Length'] = len(pdf_bytes)
-        
-        return response
+        # Create response with PDF; headers are passed at construction and
+        # Content-Length is derived from the body
+        return Response(
+            pdf_bytes,
+            mimetype='application/pdf',
+            headers={'Content-Disposition': f'attachment; filename="dsa_chat_{int(time.time())}.pdf"'}
+        )
         
     except Exception as e:
-        logger.error(f"PDF download error: {e}")
+        logger.error("PDF download error: %s", e)
         return jsonify({
             "error": "Download failed",
             "message": "Unable to generate PDF"
@@ -316,7 +332,7 @@ def download_chat():
 def api_stats():
     """Get API usage statistics for the current user"""
     try:
-        user_id = session.get('google_id')
+        user_id = g.user_id
         
         # This would typically query a usage tracking database
         # For now, return mock statistics
@@ -331,7 +347,7 @@ def api_stats():
         return jsonify(stats)
         
     except Exception as e:
-        logger.error(f"Stats fetch error: {e}")
+        logger.error("Stats fetch error: %s", e)
         return jsonify({
             "error": "Unable to fetch statistics"
         }), 500
@@ -356,7 +372,7 @@ def submit_feedback():
         if rating is not None and (not isinstance(rating, int) or rating < 1 or rating > 5):
             return jsonify({"error": "Rating must be between 1 and 5"}), 400
         
-        user_id = session.get('google_id')
+        user_id = g.user_id
         user_email = session.get('email')
         
         # Store feedback (this would typically go to a database)
@@ -369,7 +385,7 @@ def submit_feedback():
             "user_agent": request.headers.get('User-Agent', '')
         }
         
-        logger.info(f"📝 Feedback received from {user_email}: {rating}/5 stars")
+        logger.info("📝 Feedback received from %s: %s/5 stars", user_email, rating)
         
         # In a real application, save to database here
         # supabase_service.get_table('feedback').insert(feedback_record).execute()
@@ -380,7 +396,7 @@ def submit_feedback():
         })
         
     except Exception as e:
-        logger.error(f"Feedback submission error: {e}")
+        logger.error("Feedback submission error: %s", e)
         return jsonify({
             "error": "Failed to submit feedback"
         }), 500
@@ -5,7 +5,7 @@ import pandas as pd
 import requests
 import os
 import time
-from ..extensions import supabase, logger
+from ..extensions import get_supabase_client, logger
 
 HF_API_URL = "https://router.huggingface.co/hf-inference/models/sentence-transformers/all-MiniLM-L6-v2/pipeline/feature-extraction"
 HF_API_TOKEN = os.getenv("HF_API_TOKEN")
@@ -30,7 +30,7 @@ def get_embedding_from_api(text: str, use_backup=False, max_retries=3):
     
     for attempt in range(max_retries):
         try:
-            logger.debug(f"API request attempt {attempt + 1}/{max_retries} using {'backup' if use_backup else 'primary'} token")
+            logger.debug("API request attempt %s/%s using %s token", attempt + 1, max_retries, 'backup' if use_backup else 'primary')
             
             response = requests.post(HF_API_URL, headers=headers, json=payload, timeout=15)
             response.raise_for_status()
@@ -47,13 +47,13 @@ def get_embedding_from_api(text: str, use_backup=False, max_retries=3):
                 arr = arr.astype(np.float32)
 
             if len(arr) != 384:
-                logger.warning(f"Embedding dimension mismatch: got {len(arr)}")
+                logger.warning("Embedding dimension mismatch: got %s", len(arr))
             
-            logger.debug(f"Successfully got embedding using {'backup' if use_backup else 'primary'} token; shape={arr.shape}")
+            logger.debug("Successfully got embedding using %s token; shape=%s", 'backup' if use_backup else 'primary', arr.shape)
             return arr
             
         except requests.exceptions.Timeout as e:
-            logger.warning(f"Timeout on attempt {attempt + 1} with {'backup' if use_backup else 'primary'} token: {e}")
+            logger.warning("Timeout on attempt %s with %s token: %s", attempt + 1, 'backup' if use_backup else 'primary', e)
             
             # If primary token times out and backup is available, try backup
             if not use_backup and HF_API_TOKEN_BACKUP and attempt == 0:
@@ -62,16 +62,16 @@ def get_embedding_from_api(text: str, use_backup=False, max_retries=3):
             
             # If this was the last attempt, break and handle below
             if attempt == max_retries - 1:
-                logger.error(f"All attempts timed out for {'backup' if use_backup else 'primary'} token")
+                logger.error("All attempts timed out for %s token", 'backup' if use_backup else 'primary')
                 break
                 
             # Exponential backoff for retry
             wait_time = 2 ** attempt
-            logger.info(f"Retrying in {wait_time} seconds...")
+            logger.info("Retrying in %s seconds...", wait_time)
             time.sleep(wait_time)
             
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Request error on attempt {attempt + 1} with {'backup' if use_backup else 'primary'} token: {e}")
+            logger.warning("Request error on attempt %s with %s token: %s", attempt + 1, 'backup' if use_backup else 'primary', e)
             
             # Try backup token if primary fails and backup is available
             if not use_backup and HF_API_TOKEN_BACKUP and attempt == 0:
@@ -80,16 +80,16 @@ def get_embedding_from_api(text: str, use_backup=False, max_retries=3):
             
             # If this was the last attempt, break and handle below
             if attempt == max_retries - 1:
-                logger.error(f"All attempts failed for {'backup' if use_backup else 'primary'} token")
+                logger.error("All attempts failed for %s token", 'backup' if use_backup else 'primary')
                 break
                 
             # Exponential backoff for retry
             wait_time = 2 ** attempt
-            logger.info(f"Retrying in {wait_time} seconds...")
+            logger.info("Retrying in %s seconds...", wait_time)
             time.sleep(wait_time)
             
         except Exception as e:
-            logger.error(f"Unexpected error getting embedding from API: {e}")
+            logger.error("Unexpected error getting embedding from API: %s", e)
             
             # Try backup token if primary fails and this is first attempt
             if not use_backup and HF_API_TOKEN_BACKUP and attempt == 0:
@@ -99,7 +99,7 @@ def get_embedding_from_api(text: str, use_backup=False, max_retries=3):
             break
     
     # If we get here, all attempts failed
-    logger.error(f"Failed to get embedding after {max_retries} attempts with {'backup' if use_backup else 'primary'} token")
+    logger.error("Failed to get embedding after %s attempts with %s token", max_retries, 'backup' if use_backup else 'primary')
     return None
 
 def _to_array(embedding_data):
@@ -110,71 +110,72 @@ def _to_array(embedding_data):
     
     try:
         if isinstance(embedding_data, np.ndarray):
-            logger.debug(f"Already numpy array, shape: {embedding_data.shape}")
+            logger.debug("Already numpy array, shape: %s", embedding_data.shape)
             return embedding_data
         
         if isinstance(embedding_data, list):
             arr = np.array(embedding_data)
-            logger.debug(f"Converted from list, shape: {arr.shape}")
+            logger.debug("Converted from list, shape: %s", arr.shape)
             return arr
         
         if isinstance(embedding_data, str):
             s = embedding_data.strip()
-            logger.debug(f"Processing string of length {len(s)}")
+            logger.debug("Processing string of length %s", len(s))
             
             if s.startswith('{') and s.endswith('}'):
                 try:
                     nums_str = s[1:-1]
                     nums = [float(x.strip()) for x in nums_str.split(',') if x.strip()]
                     arr = np.array(nums)
-                    logger.debug(f"Parsed PostgreSQL array format, shape: {arr.shape}")
+                    logger.debug("Parsed PostgreSQL array format, shape: %s", arr.shape)
                     return arr
                 except Exception as e:
-                    logger.debug(f"Failed to parse PostgreSQL format: {e}")
+                    logger.debug("Failed to parse PostgreSQL format: %s", e)
             
             if s.startswith('[') and s.endswith(']'):
                 try:
                     nums = [float(x.strip()) for x in s[1:-1].split(',') if x.strip()]
                     arr = np.array(nums)
-                    logger.debug(f"Parsed JSON array format, shape: {arr.shape}")
+                    logger.debug("Parsed JSON array format, shape: %s", arr.shape)
                     return arr
                 except Exception as e:
-                    logger.debug(f"Failed to parse JSON format manually: {e}")
+                    logger.debug("Failed to parse JSON format manually: %s", e)
             
             try:
                 parsed = json.loads(s)
                 arr = np.array(parsed)
-                logger.debug(f"JSON parsed successfully, shape: {arr.shape}")
+                logger.debug("JSON parsed successfully, shape: %s", arr.shape)
                 return arr
             except Exception as e:
-                logger.debug(f"JSON parse failed: {e}")
+                logger.debug("JSON parse failed: %s", e)
             
             try:
                 parsed = ast.literal_eval(s)
                 arr = np.array(parsed)
-                logger.debug(f"ast.literal_eval parsed successfully, shape: {arr.shape}")
+                logger.debug("ast.literal_eval parsed successfully, shape: %s", arr.shape)
                 return arr
             except Exception as e:
-                logger.debug(f"ast.literal_eval failed: {e}")
+                logger.debug("ast.literal_eval failed: %s", e)
         
         arr = np.array(embedding_data)
-        logger.debug(f"Direct conversion, shape: {arr.shape}")
+        logger.debug("Direct conversion, shape: %s", arr.shape)
         return arr
     
     except Exception as e:
-        logger.error(f"All parsing methods failed: {e}")
+        logger.error("All parsing methods failed: %s", e)
         return None
 
 def fetch_text_df():
     """Fetch text embeddings table from Supabase, parse embeddings, and validate."""
     try:
+        supabase = get_supabase_client()
         if supabase is None:
             logger.error("Supabase client not initialized")
             return pd.DataFrame()
         
         res = supabase.table("text_embeddings").select("id, content, embedding::text").execute()
         df = pd.DataFrame(res.data or [])
-        logger.info(f"Raw text_embeddings rows: {len(df)}")
+        logger.info("Raw text_embeddings rows: %s", len(df))
         
         if df.empty:
             return df
@@ -185,22 +186,23 @@ def fetch_text_df():
         
         df = df[df["embedding"].apply(lambda x: hasattr(x, "__len__") and len(x) == 384)]
         
-        logger.info(f"Loaded {len(df)} text records with valid embeddings")
+        logger.info("Loaded %s text records with valid embeddings", len(df))
         return df
     except Exception as e:
-        logger.error(f"text fetch error: {e}")
+        logger.error("text fetch error: %s", e)
         return pd.DataFrame()
 
 def fetch_qa_df():
     """Fetch QA resources from Supabase, parse embeddings, and validate."""
     try:
+        supabase = get_supabase_client()
         if supabase is None:
             logger.error("Supabase client not initialized")
             return pd.DataFrame()
         
         res = supabase.table("qa1_resources").select("id, section, question, article_link, practice_link, embedding::text").execute()
         df = pd.DataFrame(res.data or [])
-        logger.info(f"Raw qa1_resources rows: {len(df)}")
+        logger.info("Raw qa1_resources rows: %s", len(df))
         
         if df.empty:
             logger.warning("qa1_resources table is empty!")
@@ -212,8 +214,8 @@ def fetch_qa_df():
         
         df = df[df["embedding"].apply(lambda x: hasattr(x, "__len__") and len(x) == 384)]
         
-        logger.info(f"Final QA records with valid embeddings: {len(df)}")
+        logger.info("Final QA records with valid embeddings: %s", len(df))
         return df
     except Exception as e:
-        logger.error(f"qa fetch error: {e}")
+        logger.error("qa fetch error: %s", e)
         return pd.DataFrame()
\ No newline at end of file
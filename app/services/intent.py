@@ -251,7 +251,7 @@ def classify_query_with_groq(user_query: str) -> Dict[str, Any]:
             return classify_query_fallback(user_query)
         
     except Exception as e:
-        logger.warning(f"Error accessing config, using fallback: {e}")
+        logger.warning("Error accessing config, using fallback: %s", e)
         return classify_query_fallback(user_query)
     
     # Prepare enhanced API request
@@ -296,7 +296,7 @@ Set is_dsa=true for dsa_specific and question_generation categories."""
     }
     
     try:
-        logger.debug(f"🔍 Calling Groq API for classification: '{user_query[:50]}...'")
+        logger.debug("🔍 Calling Groq API for classification: '%s...'", user_query[:50])
         
         response = requests.post(
             api_url, 
@@ -322,7 +322,7 @@ Set is_dsa=true for dsa_specific and question_generation categories."""
             return _validate_classification_result(parsed, user_query)
             
         except json.JSONDecodeError as e:
-            logger.error(f"JSON parse error: {e}, content: {repr(cleaned_content[:200])}")
+            logger.error("JSON parse error: %s, content: %r", e, cleaned_content[:200])
             return classify_query_fallback(user_query)
         
     except requests.exceptions.Timeout:
@@ -330,11 +330,11 @@ Set is_dsa=true for dsa_specific and question_generation categories."""
         return classify_query_fallback(user_query)
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Groq API request error: {e} - using fallback")
+        logger.error("Groq API request error: %s - using fallback", e)
         return classify_query_fallback(user_query)
         
     except Exception as e:
-        logger.error(f"Unexpected error in Groq classification: {e} - using fallback")
+        logger.error("Unexpected error in Groq classification: %s - using fallback", e)
         return classify_query_fallback(user_query)
 
 
@@ -364,7 +364,7 @@ def _extract_response_content(response_json: Dict) -> Optional[str]:
         return None
         
     except Exception as e:
-        logger.error(f"Error extracting response content: {e}")
+        logger.error("Error extracting response content: %s", e)
         return None
 
 
@@ -408,7 +408,7 @@ def _validate_classification_result(parsed: Dict, user_query: str) -> Dict[str,
     
     valid_types = ["greeting", "casual_chat", "fun_chat", "dsa_specific", "question_generation", "vague_question"]
     if parsed["type"] not in valid_types:
-        logger.warning(f"Invalid type '{parsed['type']}', defaulting to 'vague_question'")
+        logger.warning("Invalid type '%s', defaulting to 'vague_question'", parsed['type'])
         parsed["type"] = "vague_question"
     
     # Normalize confidence
@@ -432,7 +432,7 @@ def _validate_classification_result(parsed: Dict, user_query: str) -> Dict[str,
         parsed["is_dsa"] = True
         logger.debug("Corrected is_dsa flag for DSA-related classification")
     
-    logger.info(f"✅ Groq classification successful: {parsed['type']} (confidence: {parsed['confidence']:.2f})")
+    logger.info("✅ Groq classification successful: %s (confidence: %.2f)", parsed['type'], parsed['confidence'])
     return parsed
 
 
@@ -728,5 +728,5 @@ def enhanced_summarize_with_context(text: str, ctx: Dict, original_query: str) -
         return summary
         
     except Exception as e:
-        logger.error(f"Enhanced summarization failed: {e}")
+        logger.error("Enhanced summarization failed: %s", e)
         return text[:300] + "..." if len(text) > 300 else text
\ No newline at end of file
@@ -31,7 +31,7 @@ def best_text_for_query(query: str, text_df):
             best_row["embedding"] = best_row["embedding"].tolist()
         return best_row
     except Exception as e:
-        logger.error(f"best_text_for_query error: {e}")
+        logger.error("best_text_for_query error: %s", e)
         return {"error": str(e)}
 
 def top_qa_for_query(query: str, qa_df, k: int = 5):
@@ -64,5 +64,5 @@ def top_qa_for_query(query: str, qa_df, k: int = 5):
                 r["similarity"] = float(r["similarity"])
         return recs
     except Exception as e:
-        logger.error(f"top_qa_for_query error: {e}")
+        logger.error("top_qa_for_query error: %s", e)
         return []
\ No newline at end of file
@@ -1,6 +1,6 @@
 import re
 from typing import List, Dict, Optional
-from ..extensions import supabase, logger
+from ..extensions import get_supabase_client, logger
 
 def extract_youtube_id(url: str) -> Optional[str]:
     if not url or not isinstance(url, str) or url == '#':
@@ -16,7 +16,7 @@ def extract_youtube_id(url: str) -> Optional[str]:
         match = re.search(pattern, url)
         if match and match.group(1):
             return match.group(1)
-    logger.warning(f"Could not extract YouTube ID from URL: {url}")
+    logger.warning("Could not extract YouTube ID from URL: %s", url)
     return None
 
 def get_videos(topic: str, limit: int = 5) -> List[Dict]:
@@ -24,6 +24,7 @@ def get_videos(topic: str, limit: int = 5) -> List[Dict]:
         logger.warning("Empty topic provided to get_videos")
         return []
 
+    supabase = get_supabase_client()
     if not supabase:
         logger.error("Supabase client not initialized")
         return []
@@ -65,5 +66,5 @@ def get_videos(topic: str, limit: int = 5) -> List[Dict]:
         return out
 
     except Exception as e:
-        logger.error(f"Supabase videos error: {e}")
+        logger.error("Supabase videos error: %s", e)
         return []
@@ -25,14 +25,14 @@ def create_application():
         app = create_app(config_name)
         
         # Log startup information
-        logger.info(f"🚀 DSA Mentor starting with {config_name} configuration")
-        logger.info(f"📊 Environment: {os.environ.get('FLASK_ENV', 'production')}")
-        logger.info(f"🌐 Port: {os.environ.get('PORT', '50017')}")
+        logger.info("🚀 DSA Mentor starting with %s configuration", config_name)
+        logger.info("📊 Environment: %s", os.environ.get('FLASK_ENV', 'production'))
+        logger.info("🌐 Port: %s", os.environ.get('PORT', '50017'))
         
         return app
         
     except Exception as e:
-        logger.error(f"❌ Failed to create application: {e}")
+        logger.error("❌ Failed to create application: %s", e)
         raise
 
 # Create the application instance
@@ -49,8 +49,8 @@ if __name__ == "__main__":
         # Determine if debug mode should be enabled
         debug_mode = os.environ.get("FLASK_ENV") == "development"
         
-        logger.info(f"🎯 Starting server on {host}:{port}")
-        logger.info(f"🔧 Debug mode: {debug_mode}")
+        logger.info("🎯 Starting server on %s:%s", host, port)
+        logger.info("🔧 Debug mode: %s", debug_mode)
         
         # Start the application
         app.run(
@@ -62,5 +62,5 @@ if __name__ == "__main__":
         )
         
     except Exception as e:
-        logger.error(f"❌ Failed to start application: {e}")
+        logger.error("❌ Failed to start application: %s", e)
         exit(1)
\ No newline at end of file
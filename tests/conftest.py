@@ -0,0 +1,4 @@
+import os
+
+# app.config refuses to import without a secret key
+os.environ.setdefault("FLASK_SECRET_KEY", "test-secret-key")
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.auth.routes import _safe_next_url, _snapshot_auth_config
+
+
+def _make_app(origins):
+    app = Flask(__name__)
+    app.config.update(TESTING=True, ALLOWED_ORIGINS_SET=frozenset(origins))
+    _snapshot_auth_config(SimpleNamespace(app=app))
+    return app
+
+
+@pytest.fixture
+def app():
+    return _make_app(["https://frontend.example", "localhost:3000"])
+
+
+def test_schemeless_origin_adds_no_redirect_host(app):
+    assert app.extensions['auth_config']['REDIRECT_NETLOCS'] == frozenset({"frontend.example"})
+
+
+@pytest.mark.parametrize("target", [
+    "http:evil.com",
+    "https:evil.com",
+    "https:/evil.com",
+    "//evil.com",
+    "///evil.com",
+    "/\\/evil.com",
+    "https://evil.com/",
+    "javascript:alert(1)",
+])
+def test_offsite_targets_fall_back_to_root(app, target):
+    with app.test_request_context(base_url="https://app.example"):
+        assert _safe_next_url(target) == "/"
+
+
+@pytest.mark.parametrize("target", [
+    "/chat?x=1",
+    "https://app.example/chat",
+    "https://frontend.example/dashboard",
+])
+def test_trusted_targets_are_kept(app, target):
+    with app.test_request_context(base_url="https://app.example"):
+        assert _safe_next_url(target) == target
@@ -20,12 +20,12 @@ def create_wsgi_application():
         # Create the application
         application = create_app(config_name)
         
-        logger.info(f"🚀 WSGI application created with {config_name} configuration")
+        logger.info("🚀 WSGI application created with %s configuration", config_name)
         
         return application
         
     except Exception as e:
-        logger.error(f"❌ Failed to create WSGI application: {e}")
+        logger.error("❌ Failed to create WSGI application: %s", e)
         raise
 
 # Create the WSGI application instance